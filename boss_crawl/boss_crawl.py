@@ -5,16 +5,29 @@ Boss直聘岗位详情爬虫
 """
 
 import asyncio
+import contextlib
 import json
 import logging
 import os
+import random
 import re
 import yaml
 import time
+import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml C实现
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    import orjson  # 更快的JSON序列化
+except ImportError:
+    orjson = None
+
 from playwright.async_api import async_playwright, Browser, Page, BrowserContext
 
 # 配置日志
@@ -24,16 +37,116 @@ logging.basicConfig(
 )
 logger = logging.getLogger("boss_job_detail_crawler")
 
+# 默认并发worker数量
+DEFAULT_CONCURRENCY = 8
+
+# 同一站点同时进行的页面请求上限及每秒请求数
+DEFAULT_MAX_CONCURRENT_PER_HOST = 3
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+
+# 岗位字段 -> CSS选择器
+SELECTORS = {
+    'title': '.name h1',
+    'salary': '.salary',
+    'city': '.text-city',
+    'experience': '.text-experience',
+    'education': '.text-degree',
+    'company': '.company-info .name',
+    'company_type': '.company-info .type',
+    'company_size': '.company-info .size',
+    'job_description': '.job-sec-text',
+}
+TAGS_SELECTOR = '.job-tags span'
+
+# 反爬验证页 / 404页标识
+VERIFY_PAGE_SELECTOR = 'text=访问验证'
+NOT_FOUND_PAGE_SELECTOR = '.page-404'
+
+# 遇到验证页后所有worker暂停请求的秒数
+BLOCKED_BACKOFF_SECONDS = 30
+
+# 登录后才会下发的认证cookie
+AUTH_COOKIE_NAMES = {'wt2', 'bst', 'geek_zp_token'}
+
+# CSV输出字段（固定schema，支持逐条写入）
+CSV_FIELDNAMES = ['url', *SELECTORS, 'tags', 'error', 'extracted_at']
+
+# 登录状态标识
+LOGIN_INDICATORS = [
+    'a[href*="/web/geek/chat"]',  # 聊天入口
+    '.nav-figure img',  # 用户头像
+    'a[ka="header-username"]',  # 用户名链接
+]
+
+# 岗位页只需要DOM文本，屏蔽图片、样式表、字体、媒体资源以减少下载和渲染开销
+# （仅作用于worker页面，登录页需要正常显示二维码和验证码）
+BLOCKED_URL_EXTENSIONS = [
+    'png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico',
+    'css', 'woff', 'woff2', 'ttf', 'otf', 'eot',
+    'mp4', 'webm', 'mp3', 'm3u8',
+]
+BLOCKED_URL_PATTERNS = [
+    pattern
+    for ext in BLOCKED_URL_EXTENSIONS
+    for pattern in (f'*.{ext}', f'*.{ext}?*')
+]
+
+# 在页面内一次性读取所有字段及标签，避免逐个元素往返
+EXTRACT_ALL_JS = """
+([selectors, tagsSelector]) => ({
+    fields: Object.fromEntries(Object.entries(selectors).map(
+        ([key, sel]) => [key, (document.querySelector(sel)?.textContent || '').trim()])),
+    tags: Array.from(document.querySelectorAll(tagsSelector))
+        .map(e => (e.textContent || '').trim())
+        .filter(Boolean),
+})
+"""
+
+
+class HostRateLimiter:
+    """站点级限速器：所有worker共享，限制同时进行的页面请求数，并保证相邻两次请求至少间隔 1/rps 秒"""
+
+    def __init__(self, rps: float, max_concurrent: int = DEFAULT_MAX_CONCURRENT_PER_HOST):
+        if rps <= 0:
+            raise ValueError(f"rps必须为正数: {rps}")
+        self.min_gap = 1 / rps
+        self.next_t = 0.0
+        self.lock = asyncio.Lock()
+        self.semaphore = asyncio.BoundedSemaphore(max(1, max_concurrent))
+
+    @contextlib.asynccontextmanager
+    async def request(self):
+        """占用一个并发名额并等待限速，仅包住页面导航本身"""
+        async with self.semaphore:
+            await self.wait()
+            yield
+
+    async def wait(self):
+        """等待直到允许发出下一次请求"""
+        async with self.lock:
+            now = time.monotonic()
+            delay = max(0.0, self.next_t - now)
+            self.next_t = max(now, self.next_t) + self.min_gap
+        await asyncio.sleep(delay)
+
+    async def pause(self, seconds: float):
+        """推迟下一次请求，所有共享该限速器的worker一起暂停"""
+        async with self.lock:
+            self.next_t = max(self.next_t, time.monotonic() + seconds)
+
 
 class BossJobDetailCrawler:
     """Boss直聘岗位详情爬虫"""
 
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, rate_limiter: Optional[HostRateLimiter] = None):
         self.headless = headless
+        self.rate_limiter = rate_limiter or HostRateLimiter(DEFAULT_REQUESTS_PER_SECOND)
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.playwright = None
+        self._pending_screenshots: Set[asyncio.Task] = set()
+        self._page_screenshots: Dict[Page, asyncio.Task] = {}
 
     async def start(self):
         """启动浏览器"""
@@ -44,17 +157,28 @@ class BossJobDetailCrawler:
         user_data_dir = os.path.expanduser('~/boss_crawler_data')
         os.makedirs(user_data_dir, exist_ok=True)
 
+        args = [
+            '--disable-blink-features=AutomationControlled',
+            '--disable-web-security',
+            # 500MB磁盘缓存，跨页面复用应用外壳资源
+            # 注意：不要注册 page.route/context.route，启用路由会使HTTP缓存失效
+            '--disk-cache-size=524288000',
+            '--disable-gpu',
+            '--disable-extensions',
+            '--disable-dev-shm-usage',
+            '--disable-background-networking',
+        ]
+        # 无头模式下无需人工登录/验证，可全局禁用图片
+        if self.headless:
+            args.append('--blink-settings=imagesEnabled=false')
+
         # 使用系统 Chrome
         self.browser = await self.playwright.chromium.launch_persistent_context(
             user_data_dir=user_data_dir,
             headless=self.headless,
             channel="chrome",  # 指定使用系统 Chrome
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security',
-                '--start-maximized'
-            ],
-            viewport={'width': 1280, 'height': 800},
+            args=args,
+            viewport={'width': 800, 'height': 600},
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         )
 
@@ -62,99 +186,123 @@ class BossJobDetailCrawler:
         self.page = pages[0] if pages else await self.browser.new_page()
         logger.info("浏览器启动成功")
 
+    async def _block_resources(self, page: Page):
+        """通过CDP按URL屏蔽无用资源
+
+        不使用 page.route/context.route：启用路由会关闭HTTP缓存，
+        且每个请求（包括需要保留的）都要经过一次Python回调。
+        """
+        session = await self.browser.new_cdp_session(page)
+        await session.send('Network.enable')
+        await session.send('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+
+    async def _make_worker_page(self) -> Page:
+        """为worker创建独立的页面（共享持久化上下文及登录状态）"""
+        page = await self.browser.new_page()
+        await self._block_resources(page)
+        return page
+
     async def ensure_logged_in(self):
         """确保已登录Boss直聘"""
         logger.info("检查登录状态...")
 
+        # 持久化目录中已有认证cookie时直接复用，省去首页导航
+        cookies = await self.browser.cookies("https://www.zhipin.com")
+        if any(c['name'] in AUTH_COOKIE_NAMES for c in cookies):
+            logger.info("复用已有登录cookie")
+            return True
+
         # 导航到Boss直聘首页
         await self.page.goto("https://www.zhipin.com", wait_until="domcontentloaded")
-        await asyncio.sleep(3)
+        try:
+            await self.page.wait_for_load_state("networkidle", timeout=5000)
+        except:
+            logger.warning("首页网络未空闲，继续检查登录状态")
 
         # 检查登录状态
-        logged_in = False
-        login_indicators = [
-            'a[href*="/web/geek/chat"]',  # 聊天入口
-            '.nav-figure img',  # 用户头像
-            'a[ka="header-username"]',  # 用户名链接
-        ]
+        if await self._is_logged_in():
+            logger.info("检测到已登录状态")
+            return True
 
-        for indicator in login_indicators:
-            try:
-                element = await self.page.query_selector(indicator)
-                if element:
-                    logger.info("检测到已登录状态")
-                    logged_in = True
-                    break
-            except:
-                continue
+        logger.info("未检测到登录状态，请在浏览器中完成登录...")
 
-        if not logged_in:
-            logger.info("未检测到登录状态，请手动登录...")
-            logger.info("请在浏览器中完成登录，然后按Enter继续")
-            input("按Enter继续...")
+        # 轮询登录状态，不阻塞事件循环
+        for _ in range(60):  # 最多等待5分钟
+            await asyncio.sleep(5)
+            if await self._is_logged_in():
+                logger.info("登录成功!")
+                return True
+            logger.info("等待登录中...")
 
-            # 等待用户登录
-            for _ in range(60):  # 最多等待5分钟
-                await asyncio.sleep(5)
-                for indicator in login_indicators:
-                    try:
-                        element = await self.page.query_selector(indicator)
-                        if element:
-                            logger.info("登录成功!")
-                            return True
-                    except:
-                        continue
-                logger.info("等待登录中...")
-
-            logger.error("登录超时")
-            return False
+        logger.error("登录超时")
+        return False
 
-        return True
+    async def _is_logged_in(self) -> bool:
+        """检查页面上是否存在任一登录标识"""
+        try:
+            return await self.page.query_selector(', '.join(LOGIN_INDICATORS)) is not None
+        except:
+            return False
 
-    async def extract_job_details(self, job_url: str) -> Dict[str, Any]:
+    async def extract_job_details(self, page: Page, job_url: str) -> Dict[str, Any]:
         """从岗位链接提取详细信息"""
         logger.info(f"开始提取岗位详情: {job_url}")
 
         try:
-            # 导航到岗位详情页
-            await self.page.goto(job_url, wait_until="domcontentloaded")
-            await asyncio.sleep(3)  # 等待页面加载
+            # 该页面上一次失败的截图完成后才能复用页面，避免截到下一个岗位
+            pending_screenshot = self._page_screenshots.pop(page, None)
+            if pending_screenshot:
+                await pending_screenshot
 
-            # 等待关键元素出现
-            try:
-                await self.page.wait_for_selector('.job-banner', timeout=10000)
-            except:
+            # 导航到岗位详情页
+            async with self.rate_limiter.request():
+                await page.goto(job_url, wait_until="domcontentloaded")
+
+            # 等待岗位标题出现即开始提取；若先出现验证页/404页则立即放弃
+            state = await self._wait_for_page_state(page)
+            if state in ('blocked', 'not_found'):
+                if state == 'blocked':
+                    logger.warning(f"岗位页面被拦截，暂停请求 {BLOCKED_BACKOFF_SECONDS} 秒: {job_url}")
+                    await self.rate_limiter.pause(BLOCKED_BACKOFF_SECONDS)
+                else:
+                    logger.warning(f"岗位不存在: {job_url}")
+                return {
+                    'url': job_url,
+                    'error': state,
+                    'extracted_at': datetime.now().isoformat()
+                }
+            if state is None:
                 logger.warning("页面加载可能超时，继续尝试提取")
 
             # 提取岗位信息
+            extracted = await self._extract_all(page, SELECTORS)
             job_details = {
                 'url': job_url,
-                'title': await self._extract_text('.name h1'),
-                'salary': await self._extract_text('.salary'),
-                'city': await self._extract_text('.text-city'),
-                'experience': await self._extract_text('.text-experience'),
-                'education': await self._extract_text('.text-degree'),
-                'company': await self._extract_text('.company-info .name'),
-                'company_type': await self._extract_text('.company-info .type'),
-                'company_size': await self._extract_text('.company-info .size'),
-                'job_description': await self._extract_text('.job-sec-text'),
+                **extracted['fields'],
                 'extracted_at': datetime.now().isoformat()
             }
 
             # 提取标签信息
-            tags = await self._extract_tags()
-            if tags:
-                job_details['tags'] = tags
+            if extracted['tags']:
+                job_details['tags'] = extracted['tags']
+
+            # 未提取到标题（如页面超时或登录cookie失效）视为失败，下次运行会重新抓取
+            if not job_details.get('title'):
+                logger.warning(f"未提取到岗位标题: {job_url}")
+                job_details['error'] = 'timeout'
+                return job_details
 
             logger.info(f"成功提取岗位: {job_details.get('title', '未知')}")
             return job_details
 
         except Exception as e:
             logger.error(f"提取岗位详情失败: {e}")
-            # 保存截图以便调试
-            screenshot_path = f"error_screenshot_{int(time.time())}.png"
-            await self.page.screenshot(path=screenshot_path)
-            logger.info(f"已保存错误截图: {screenshot_path}")
+            # 后台保存截图以便调试，不阻塞结果写入；下次复用该页面前会等待截图完成
+            screenshot_path = f"error_screenshot_{int(time.time())}_{uuid.uuid4().hex[:8]}.png"
+            task = asyncio.create_task(self._save_screenshot(page, screenshot_path))
+            self._pending_screenshots.add(task)
+            task.add_done_callback(self._pending_screenshots.discard)
+            self._page_screenshots[page] = task
 
             return {
                 'url': job_url,
@@ -162,32 +310,55 @@ class BossJobDetailCrawler:
                 'extracted_at': datetime.now().isoformat()
             }
 
-    async def _extract_text(self, selector: str) -> str:
-        """提取文本内容"""
+    async def _wait_for_page_state(self, page: Page, timeout: int = 10000) -> Optional[str]:
+        """等待岗位标题、验证页或404页标识出现，返回 'ready' / 'blocked' / 'not_found'，均超时返回 None"""
+        waiters = {
+            asyncio.create_task(page.wait_for_selector(selector, timeout=timeout)): state
+            for selector, state in (
+                (SELECTORS['title'], 'ready'),
+                (VERIFY_PAGE_SELECTOR, 'blocked'),
+                (NOT_FOUND_PAGE_SELECTOR, 'not_found'),
+            )
+        }
+
+        pending = set(waiters)
         try:
-            element = await self.page.query_selector(selector)
-            if element:
-                text = await element.text_content()
-                return text.strip() if text else ""
-        except:
-            pass
-        return ""
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # 先读取本批所有任务的异常，避免 "Task exception was never retrieved"
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    return waiters[succeeded[0]]
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _extract_all(self, page: Page, selectors: Dict[str, str]) -> Dict[str, Any]:
+        """一次 page.evaluate 提取所有字段文本及标签"""
+        try:
+            return await page.evaluate(EXTRACT_ALL_JS, [selectors, TAGS_SELECTOR])
+        except Exception as e:
+            logger.warning(f"批量提取失败: {e}")
+            return {'fields': {key: "" for key in selectors}, 'tags': []}
 
-    async def _extract_tags(self) -> List[str]:
-        """提取标签信息"""
-        tags = []
+    async def _save_screenshot(self, page: Page, path: str):
+        """保存页面截图"""
         try:
-            tag_elements = await self.page.query_selector_all('.job-tags span')
-            for tag_element in tag_elements:
-                tag_text = await tag_element.text_content()
-                if tag_text and tag_text.strip():
-                    tags.append(tag_text.strip())
-        except:
-            pass
-        return tags
+            await page.screenshot(path=path)
+            logger.info(f"已保存错误截图: {path}")
+        except Exception as e:
+            logger.warning(f"保存错误截图失败: {e}")
+
+    async def _flush_screenshots(self):
+        """等待所有后台截图任务完成"""
+        if self._pending_screenshots:
+            await asyncio.gather(*self._pending_screenshots)
+        self._page_screenshots.clear()
 
     async def close(self):
         """关闭浏览器"""
+        await self._flush_screenshots()
         if self.browser:
             await self.browser.close()
         if self.playwright:
@@ -195,6 +366,60 @@ class BossJobDetailCrawler:
         logger.info("浏览器已关闭")
 
 
+def dump_json(obj: Any, indent: bool = False) -> bytes:
+    """序列化为UTF-8 JSON字节串，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def load_json(data):
+    """反序列化JSON，优先使用 orjson"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def load_crawled_urls(output_dir: str) -> set:
+    """扫描输出目录中已有结果，返回已成功提取的岗位链接"""
+    import csv
+    crawled = set()
+    for fp in Path(output_dir).glob('job_details_*'):
+        try:
+            if fp.suffix == '.jsonl':
+                # 逐行解析，崩溃留下的半行只跳过该行
+                jobs = []
+                with open(fp, 'rb') as f:
+                    for line_no, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            jobs.append(load_json(line))
+                        except ValueError:
+                            logger.warning(f"跳过无法解析的行 {fp}:{line_no}")
+            elif fp.suffix == '.json':
+                with open(fp, 'rb') as f:
+                    jobs = load_json(f.read())
+            elif fp.suffix == '.csv':
+                with open(fp, 'r', encoding='utf-8-sig', newline='') as f:
+                    jobs = list(csv.DictReader(f))
+            else:
+                continue
+        except Exception as e:
+            logger.warning(f"读取已有结果失败 {fp}: {e}")
+            continue
+        if not isinstance(jobs, list):
+            logger.warning(f"已有结果格式不正确，忽略 {fp}")
+            continue
+        # 只有提取到标题的记录才算成功，超时导致字段为空的岗位下次会重新抓取；
+        # 已确认不存在(404)的岗位同样不再重复抓取
+        crawled.update(
+            job['url'] for job in jobs
+            if isinstance(job, dict) and job.get('url') and (
+                (job.get('title') and not job.get('error')) or job.get('error') == 'not_found'
+            )
+        )
+    return crawled
+
+
 async def main():
     """主函数"""
     # 读取配置文件
@@ -205,7 +430,7 @@ async def main():
         return
 
     with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
 
     job_links = config.get('job_links', [])
     if not job_links:
@@ -219,75 +444,127 @@ async def main():
     # 创建输出目录
     os.makedirs(output_dir, exist_ok=True)
 
-    # 初始化爬虫
-    crawler = BossJobDetailCrawler(headless=False)
-    await crawler.start()
-
-    # 确保登录
-    if not await crawler.ensure_logged_in():
-        await crawler.close()
+    # 去除重复链接并跳过已成功提取过的岗位
+    job_links = list(dict.fromkeys(job_links))
+    crawled_urls = load_crawled_urls(output_dir)
+    skipped = [url for url in job_links if url in crawled_urls]
+    job_links = [url for url in job_links if url not in crawled_urls]
+    if skipped:
+        logger.info(f"跳过 {len(skipped)} 个已提取过的岗位")
+    if not job_links:
+        print("所有岗位均已提取，无需重复抓取")
         return
 
-    # 提取所有岗位详情
-    all_job_details = []
-
-    print(f"\n开始提取 {len(job_links)} 个岗位详情...")
-    print("=" * 50)
-
-    for i, job_url in enumerate(job_links, 1):
-        print(f"\n处理第 {i}/{len(job_links)} 个岗位:")
-        print(f"URL: {job_url}")
-
-        job_details = await crawler.extract_job_details(job_url)
-        all_job_details.append(job_details)
-
-        # 显示进度
-        if 'title' in job_details:
-            print(f"标题: {job_details['title']}")
-        if 'error' in job_details:
-            print(f"错误: {job_details['error']}")
-
-        # 添加延迟避免请求过于频繁
-        await asyncio.sleep(2)
-
-    # 保存结果
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    # 初始化爬虫
+    requests_per_second = float(config.get('requests_per_second', DEFAULT_REQUESTS_PER_SECOND))
+    if requests_per_second <= 0:
+        logger.warning(f"requests_per_second 必须为正数，使用默认值 {DEFAULT_REQUESTS_PER_SECOND}")
+        requests_per_second = DEFAULT_REQUESTS_PER_SECOND
+    max_per_host = max(1, int(config.get('max_concurrent_per_host', DEFAULT_MAX_CONCURRENT_PER_HOST)))
+    rate_limiter = HostRateLimiter(requests_per_second, max_per_host)
+    crawler = BossJobDetailCrawler(headless=False, rate_limiter=rate_limiter)
+    try:
+        await crawler.start()
 
-    if output_format == 'json':
-        output_path = os.path.join(output_dir, f'job_details_{timestamp}.json')
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(all_job_details, f, ensure_ascii=False, indent=2)
-        print(f"\n结果已保存为JSON: {output_path}")
+        # 确保登录
+        if not await crawler.ensure_logged_in():
+            return
 
-    elif output_format == 'csv':
-        # 简化的CSV导出
-        import csv
-        output_path = os.path.join(output_dir, f'job_details_{timestamp}.csv')
+        # 打开输出文件，每提取一个岗位立即写入，避免结果堆积在内存中
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-        # 获取所有可能的字段
-        fieldnames = set()
-        for job in all_job_details:
-            fieldnames.update(job.keys())
-        fieldnames = sorted(fieldnames)
+        if output_format == 'csv':
+            import csv
+            output_path = os.path.join(output_dir, f'job_details_{timestamp}.csv')
 
-        # 使用 utf-8-sig 编码而不是 utf-8
-        with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            # 使用 utf-8-sig 编码而不是 utf-8
+            output_file = open(output_path, 'w', encoding='utf-8-sig', newline='')
+            writer = csv.DictWriter(output_file, fieldnames=CSV_FIELDNAMES)
             writer.writeheader()
-            for job in all_job_details:
-                writer.writerow(job)
 
-        print(f"\n结果已保存为CSV: {output_path}")
-
-    # 显示统计信息
-    success_count = sum(1 for job in all_job_details if 'error' not in job)
-    error_count = len(all_job_details) - success_count
-
-    print(f"\n提取完成!")
-    print(f"成功: {success_count}, 失败: {error_count}")
-
-    # 关闭浏览器
-    await crawler.close()
+            def save_job(job: Dict[str, Any]):
+                writer.writerow(job)
+                output_file.flush()
+        else:
+            output_path = os.path.join(output_dir, f'job_details_{timestamp}.jsonl')
+            output_file = open(output_path, 'wb')
+
+            def save_job(job: Dict[str, Any]):
+                output_file.write(dump_json(job) + b'\n')
+                output_file.flush()
+
+        # 提取所有岗位详情（多个worker并发处理）
+        concurrency = max(1, min(int(config.get('concurrency', DEFAULT_CONCURRENCY)), len(job_links)))
+        success_count = 0
+        error_count = 0
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for i, job_url in enumerate(job_links):
+            queue.put_nowait((i, job_url))
+
+        print(f"\n开始提取 {len(job_links)} 个岗位详情 (并发数: {concurrency})...")
+        print("=" * 50)
+
+        async def worker(worker_id: int):
+            nonlocal success_count, error_count
+            page = await crawler._make_worker_page()
+            try:
+                while True:
+                    try:
+                        i, job_url = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+
+                    job_details = await crawler.extract_job_details(page, job_url)
+                    save_job(job_details)
+
+                    # 显示进度
+                    print(f"\n[worker {worker_id}] 第 {i + 1}/{len(job_links)} 个岗位: {job_url}")
+                    if 'title' in job_details:
+                        print(f"标题: {job_details['title']}")
+                    if 'error' in job_details:
+                        print(f"错误: {job_details['error']}")
+                        error_count += 1
+                    else:
+                        success_count += 1
+
+                    queue.task_done()
+
+                    # 随机延迟（100ms粒度）避免请求过于频繁
+                    await asyncio.sleep(random.randint(5, 20) * 0.1)
+            finally:
+                # 关闭页面前等待截图完成
+                await crawler._flush_screenshots()
+                await page.close()
+
+        workers = [asyncio.create_task(worker(i)) for i in range(concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # 任一worker出错时取消其余worker并等待其退出，再关闭输出文件
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            output_file.close()
+
+        if output_format == 'csv':
+            print(f"\n结果已保存为CSV: {output_path}")
+        else:
+            print(f"\n结果已逐条保存为JSON Lines: {output_path}")
+            # 读回 .jsonl 汇总为 .json 数组
+            json_path = output_path[:-len('.jsonl')] + '.json'
+            with open(output_path, 'rb') as src:
+                all_job_details = [load_json(line) for line in src if line.strip()]
+            with open(json_path, 'wb') as dst:
+                dst.write(dump_json(all_job_details, indent=True))
+            print(f"结果已汇总为JSON: {json_path}")
+
+        # 显示统计信息
+        print(f"\n提取完成!")
+        print(f"成功: {success_count}, 失败: {error_count}")
+    finally:
+        # 关闭浏览器
+        await crawler.close()
 
 
 if __name__ == "__main__":